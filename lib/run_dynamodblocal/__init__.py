@@ -5,18 +5,34 @@ This package requires a ``java`` command on the command line.
 
 from .version import __version__
 
-from contextlib import contextmanager, ExitStack
+import asyncio
+import atexit
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import asynccontextmanager, contextmanager, ExitStack
+import errno
+from functools import cached_property
+import hashlib
 import itertools
 import json
 import os.path
 import socket
 import subprocess as subp
 import sys
-from typing import Any, Callable, Iterable, Optional
+import tempfile
+import threading
+import time
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
 from unittest.mock import patch
 
 if sys.platform == 'win32':
     import psutil
+else:
+    import fcntl
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
 
 import logging
 _log = logging.getLogger(__name__)
@@ -30,13 +46,206 @@ PORT_TRY_TIMEOUT = (
     4 if sys.platform == 'win32'
     else 0.001
 )
-DEFAULT_PORT_RANGE = range(8100, 8500)
+# Most requests sent to DynamoDBLocal at once; also limited by the client's
+# connection pool (botocore's default holds 10)
+MAX_CONCURRENT_REQUESTS = 8
+# Seconds to wait for DynamoDBLocal to accept connections before giving up
+SERVER_READY_TIMEOUT = 10
+# JVM options favoring fast startup of a server with one light client
+DEFAULT_JAVA_OPTS = ('-XX:+UseSerialGC', '-XX:TieredStopAtLevel=1')
+# When None, the OS assigns an unused ephemeral port
+DEFAULT_PORT_RANGE = None
+# Directory for sharing parsed ``serverless print`` output between processes
+# (None disables it); entries are keyed only by the config file's path and
+# modification time, so only set this when the output does not vary with the
+# environment (e.g. ``${env:...}``, ``${opt:stage}``) or included files
+SERVERLESS_CACHE_DIR = None
+
+# Results of ``connect_ex`` taken to mean that nothing is listening on a port;
+# a timed-out connection attempt counts, as it always has
+_PORT_FREE_ERRNOS = frozenset(
+    getattr(errno, name)
+    for name in (
+        'ECONNREFUSED', 'EAGAIN', 'EWOULDBLOCK', 'ETIMEDOUT',
+        'WSAECONNREFUSED', 'WSAEWOULDBLOCK', 'WSAETIMEDOUT',
+    )
+    if hasattr(errno, name)
+)
+
+def _ephemeral_port() -> int:
+    """Get an unused TCP port number on the loopback interface from the OS
+    
+    Passing ``-port 0`` to DynamoDBLocal would leave the choice to the JVM,
+    but its startup banner echoes the configured port rather than the bound
+    one, so there is no reliable way to learn the port it picked.
+    """
+    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as s:
+        s.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+def _first_refusing_port(port_range: Iterable[int]) -> Optional[int]:
+    """Find the first port in *port_range* that refuses a TCP connection
+    
+    If *port_range* contains only one port, it is returned without probing.
+    """
+    port_range = iter(port_range)
+    try:
+        first_port = next(port_range)
+    except StopIteration:
+        return None
+    try:
+        second_port = next(port_range)
+    except StopIteration:
+        return first_port
+    
+    for port in itertools.chain((first_port, second_port), port_range):
+        # connect_ex reports failure as an errno rather than an exception.
+        # The socket is left in timeout mode rather than non-blocking: a
+        # non-blocking connect can return EINPROGRESS before the refusal
+        # arrives, even on loopback, which would make every port look busy.
+        with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as s:
+            s.settimeout(PORT_TRY_TIMEOUT)
+            err = s.connect_ex(('127.0.0.1', port))
+        if err in _PORT_FREE_ERRNOS:
+            return port
+    return None
+
+def _select_port(port_range: Optional[Iterable[int]]) -> int:
+    """Find an available TCP port for DynamoDBLocal"""
+    port_range = port_range or DEFAULT_PORT_RANGE
+    if port_range is None:
+        port = _ephemeral_port()
+    else:
+        port = _first_refusing_port(port_range)
+    
+    if port is None:
+        raise Exception(f"No sockets available in {port_range}")
+    return port
+
+def _server_command(
+    port: int,
+    java_opts: Optional[Iterable[str]] = None,
+    server_args: Iterable[str] = (),
+):
+    if java_opts is None:
+        java_opts = DEFAULT_JAVA_OPTS
+    return [
+        JAVA_PROGRAM,
+        *java_opts,
+        '-Djava.library.path=./DynamoDBLocal_lib',
+        '-jar', 'DynamoDBLocal.jar',
+        '-inMemory',
+        '-port', str(port),
+        *server_args,
+    ]
+
+def _ready_poll_delays():
+    """Yield backoff delays (seconds) until :data:`SERVER_READY_TIMEOUT` passes"""
+    deadline = time.monotonic() + SERVER_READY_TIMEOUT
+    delay = 0.005
+    while True:
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            return
+        yield min(delay, remaining)
+        delay = min(delay * 2, 0.2)
+
+def _server_spawn_kwargs(dynamodblocal_path: str) -> dict:
+    """Keyword arguments for spawning DynamoDBLocal, sync or :mod:`asyncio`"""
+    return dict(
+        cwd=dynamodblocal_path,
+        # Nothing reads the server's log, and an unread pipe eventually fills
+        # and blocks the server; a separate session keeps a terminal Ctrl-C
+        # from killing the server before it is shut down here
+        stdout=subp.DEVNULL,
+        start_new_session=True,
+        # No preexec_fn (nor uid/gid changes): that keeps CPython 3.10+ on
+        # Linux launching through vfork(), so a large test process's memory is
+        # not copied-on-write for each server
+    )
+
+def _readiness_attempts(get_returncode: Callable[[], Optional[int]]):
+    """Yield connection timeouts while waiting for DynamoDBLocal to be ready
+    
+    The caller tries a connection with each timeout yielded, stopping when
+    one succeeds and sleeping for the timeout when one fails.  An exception
+    is raised if the server exits; if the iteration runs out, the server did
+    not become ready in :data:`SERVER_READY_TIMEOUT`.  *get_returncode*
+    gives the server's exit code, or ``None`` while it runs.
+    """
+    for delay in _ready_poll_delays():
+        returncode = get_returncode()
+        if returncode is not None:
+            raise Exception(f"DynamoDBLocal returned code {returncode}")
+        yield delay
+
+def _not_ready_error(port: int) -> Exception:
+    return Exception(f"DynamoDBLocal did not accept connections on port {port} within {SERVER_READY_TIMEOUT} s")
+
+def _start_server(
+    dynamodblocal_path: str,
+    port: int,
+    java_opts: Optional[Iterable[str]] = None,
+    server_args: Iterable[str] = (),
+) -> subp.Popen:
+    """Start the DynamoDBLocal server on *port*"""
+    _log.debug('Opening DynamoDBLocal on port %d', port)
+    db_server = subp.Popen(
+        _server_command(port, java_opts, server_args),
+        **_server_spawn_kwargs(dynamodblocal_path),
+    )
+    _log.debug('DynamoDBLocal server (pid %d) on port %d', db_server.pid, port)
+    
+    # Poll until the server accepts connections; the server is in its own
+    # session, so if anything (even Ctrl-C) interrupts this, nothing else
+    # would ever stop it
+    try:
+        for delay in _readiness_attempts(db_server.poll):
+            try:
+                socket.create_connection(('127.0.0.1', port), delay).close()
+                return db_server
+            except OSError:
+                time.sleep(delay)
+        raise _not_ready_error(port)
+    except BaseException:
+        _stop_server(db_server)
+        raise
+
+def _request_termination(db_server):
+    """Ask a DynamoDBLocal server (sync or :mod:`asyncio` process) to exit"""
+    if db_server.returncode is not None:
+        return
+    _log.debug('Terminating DynamoDBLocal server (pid %d)', db_server.pid)
+    if sys.platform == 'win32':
+        children = psutil.Process(db_server.pid).children(recursive=True)
+        for child in children:
+            child.kill()
+    db_server.terminate()
+
+def _log_server_exit(db_server, returncode: int):
+    _log.debug('DynamoDBLocal (pid %d) server has exited with code %d', db_server.pid, returncode)
+
+def _kill_server(db_server):
+    _log.warning('Killing DynamoDBLocal server (pid %d), not waiting', db_server.pid)
+    db_server.kill()
+
+def _stop_server(db_server: subp.Popen):
+    """Terminate a DynamoDBLocal server and wait for it to exit"""
+    _request_termination(db_server)
+    try:
+        _log_server_exit(db_server, db_server.wait())
+    except KeyboardInterrupt:
+        _kill_server(db_server)
+        raise
 
 @contextmanager
 def in_subprocess(
     dynamodblocal_path: str,
     *,
     port_range: Optional[Iterable[int]] = None,
+    java_opts: Optional[Iterable[str]] = None,
+    server_args: Iterable[str] = (),
 ):
     """Provide an in-memory, local DynamoDB service on an unused port
     
@@ -45,7 +254,14 @@ def in_subprocess(
         obtaining this software is https://docs.aws.amazon.com/amazondynamodb/latest/developerguide/DynamoDBLocal.DownloadingAndRunning.html
     :keyword port_range:
         An *iterable* of TCP port numbers to try, where the first one that
-        refuses a TCP connection is selected; default is ``range(8100, 8500)``
+        refuses a TCP connection is selected; by default, the operating system
+        assigns an unused ephemeral port
+    :keyword java_opts:
+        Options for the ``java`` command (before ``-jar``); default is
+        :data:`DEFAULT_JAVA_OPTS`
+    :keyword server_args:
+        Additional options for DynamoDBLocal itself (e.g.
+        ``-delayTransientStatuses`` or ``-disableTelemetry``)
     :keyword on_server_missing:
         If given, called back when *dynamodblocal_path* is ``None`` and a
         DynamoDB operation is attempted; this might raise an exception for the
@@ -53,79 +269,175 @@ def in_subprocess(
     
     The port number (an :class:`int`) is yielded as the context value.
     """
-    # Find an available TCP port as *port*
-    port_range = port_range or DEFAULT_PORT_RANGE
-    port_range = iter(port_range)
+    port = _select_port(port_range)
+    db_server = _start_server(dynamodblocal_path, port, java_opts, server_args)
+    
     try:
-        port = None
-        port = first_port = next(port_range)
-        
-        # If this raises StopIteration, just use the only port given
-        second_port = next(port_range)
-    except StopIteration:
-        pass
-    else:
-        port = None
-        for port in itertools.chain((first_port, second_port), port_range):
-            try:
-                socket.create_connection(('localhost', port), PORT_TRY_TIMEOUT).close()
-            except (ConnectionRefusedError, socket.timeout):
-                break
-            port = None
+        yield port
+    finally:
+        _stop_server(db_server)
+
+# The DynamoDBLocal server shared by in_subprocess_pooled, and its port
+_SESSION_SERVER: Optional[Tuple[subp.Popen, int]] = None
+_SESSION_SERVER_LOCK = threading.Lock()
+
+def _shutdown_session_server():
+    global _SESSION_SERVER
+    with _SESSION_SERVER_LOCK:
+        if _SESSION_SERVER is not None:
+            db_server, _ = _SESSION_SERVER
+            _SESSION_SERVER = None
+            _stop_server(db_server)
+
+atexit.register(_shutdown_session_server)
+
+@contextmanager
+def in_subprocess_pooled(
+    dynamodblocal_path: str,
+    *,
+    port_range: Optional[Iterable[int]] = None,
+    java_opts: Optional[Iterable[str]] = None,
+    server_args: Iterable[str] = (),
+    dynamodb_client_for: Optional[Callable[[int], Any]] = None,
+):
+    """Provide an in-memory, local DynamoDB service shared within this process
     
-    if port is None:
-        raise Exception(f"No sockets available in {port_range}")
+    :param dynamodblocal_path:
+        Path to the unpacked DynamoDBLocal software (see :func:`in_subprocess`)
+    :keyword port_range:
+        An *iterable* of TCP port numbers to try when the server is started
+        (see :func:`in_subprocess`)
+    :keyword java_opts:
+        Options for the ``java`` command (see :func:`in_subprocess`)
+    :keyword server_args:
+        Additional options for DynamoDBLocal (see :func:`in_subprocess`)
+    :keyword dynamodb_client_for:
+        If given, called with the port number when the context exits to get a
+        DynamoDB client (e.g. from :mod:`boto3`) through which all tables are
+        deleted, giving the next user an empty database
+    
+    The first entry starts a DynamoDBLocal server which is then reused by
+    every later entry in this process, avoiding the JVM startup cost; the
+    server is terminated when the Python process exits.  The arguments of
+    the entry that starts the server are the ones that take effect.  Each
+    process (e.g. each pytest-xdist worker) gets its own server.
     
-    # Start the dynamodb_local server on *port*
+    The server runs with ``-sharedDb`` so that every client sees the same
+    tables regardless of the credentials and region it uses, which is what
+    allows *dynamodb_client_for* to clean up after any of them.
+    
+    The port number (an :class:`int`) is yielded as the context value.
+    """
+    global _SESSION_SERVER
+    with _SESSION_SERVER_LOCK:
+        if _SESSION_SERVER is not None and _SESSION_SERVER[0].poll() is not None:
+            _log.warning(
+                'Shared DynamoDBLocal server (pid %d) exited with code %d; restarting',
+                _SESSION_SERVER[0].pid, _SESSION_SERVER[0].returncode,
+            )
+            _SESSION_SERVER = None
+        if _SESSION_SERVER is None:
+            port = _select_port(port_range)
+            _SESSION_SERVER = (
+                _start_server(
+                    dynamodblocal_path, port,
+                    java_opts,
+                    ('-sharedDb', *server_args),
+                ),
+                port,
+            )
+        _, port = _SESSION_SERVER
+    
+    try:
+        yield port
+    finally:
+        if dynamodb_client_for is not None:
+            ddb = dynamodb_client_for(port)
+            for page in ddb.get_paginator('list_tables').paginate():
+                for table_name in page['TableNames']:
+                    _log.debug('Dropping table %s from shared DynamoDBLocal', table_name)
+                    ddb.delete_table(TableName=table_name)
+
+async def _start_server_async(
+    dynamodblocal_path: str,
+    port: int,
+    java_opts: Optional[Iterable[str]] = None,
+    server_args: Iterable[str] = (),
+) -> asyncio.subprocess.Process:
+    """Start the DynamoDBLocal server on *port* (see :func:`_start_server`)"""
     _log.debug('Opening DynamoDBLocal on port %d', port)
-    db_server = subp.Popen(
-        [
-            JAVA_PROGRAM,
-            '-Djava.library.path=./DynamoDBLocal_lib',
-            '-jar', 'DynamoDBLocal.jar',
-            '-inMemory',
-            '-port', str(port),
-        ],
-        cwd=dynamodblocal_path,
-        stdout=subp.PIPE,
+    db_server = await asyncio.create_subprocess_exec(
+        *_server_command(port, java_opts, server_args),
+        **_server_spawn_kwargs(dynamodblocal_path),
     )
     _log.debug('DynamoDBLocal server (pid %d) on port %d', db_server.pid, port)
     
+    # Poll until the server accepts connections; stop the server if this is
+    # cancelled or fails, as nothing else would
     try:
-        returncode = db_server.wait(timeout=0.1)
-        raise Exception(f"DynamoDBLocal returned code {returncode}")
-    except subp.TimeoutExpired:
-        pass # This is what we want to see
-    
-    endpoint_kwargs = dict(
-        endpoint_url=f"http://localhost:{port}",
-        use_ssl=False,
+        for delay in _readiness_attempts(lambda: db_server.returncode):
+            try:
+                _, writer = await asyncio.wait_for(
+                    asyncio.open_connection('127.0.0.1', port),
+                    delay,
+                )
+            except (OSError, asyncio.TimeoutError):
+                await asyncio.sleep(delay)
+            else:
+                writer.close()
+                return db_server
+        raise _not_ready_error(port)
+    except BaseException:
+        await _stop_server_async(db_server)
+        raise
+
+async def _stop_server_async(db_server: asyncio.subprocess.Process):
+    """Terminate a DynamoDBLocal server and wait for it to exit"""
+    _request_termination(db_server)
+    try:
+        _log_server_exit(db_server, await db_server.wait())
+    except asyncio.CancelledError:
+        _kill_server(db_server)
+        raise
+
+@asynccontextmanager
+async def in_subprocess_async(
+    dynamodblocal_path: str,
+    *,
+    port_range: Optional[Iterable[int]] = None,
+    java_opts: Optional[Iterable[str]] = None,
+    server_args: Iterable[str] = (),
+):
+    """Provide an in-memory, local DynamoDB service on an unused port
+    
+    This is the :mod:`asyncio` counterpart of :func:`in_subprocess`, taking
+    the same arguments; entering several of these contexts together (e.g.
+    through :func:`asyncio.gather`) overlaps the servers' JVM startups.
+    
+    The port number (an :class:`int`) is yielded as the context value.
+    """
+    # Probing an explicit port_range blocks, so keep it off the event loop
+    port = await asyncio.get_running_loop().run_in_executor(
+        None, _select_port, port_range,
     )
-        
+    db_server = await _start_server_async(
+        dynamodblocal_path, port,
+        java_opts,
+        server_args,
+    )
+    
     try:
         yield port
     finally:
-        _log.debug('Terminating DynamoDBLocal server (pid %d)', db_server.pid)
-        if sys.platform != 'win32':
-            db_server.terminate()
-        else:
-            children = psutil.Process(db_server.pid).children(recursive=True)
-            for child in children:
-                child.kill()
-            db_server.terminate()
-        try:
-            returncode = db_server.wait()
-            _log.debug('DynamoDBLocal (pid %d) server has exited with code %d', db_server.pid, returncode)
-        except KeyboardInterrupt:
-            _log.warning('Killing DynamoDBLocal server (pid %d), not waiting', db_server.pid)
-            db_server.kill()
-            raise
+        await _stop_server_async(db_server)
 
 @contextmanager
 def patched_into_boto3(
     dynamodblocal_path: Optional[str],
     *,
     port_range: Optional[Iterable[int]] = None,
+    java_opts: Optional[Iterable[str]] = None,
+    server_args: Iterable[str] = (),
     on_server_missing: Optional[Callable[[], Any]] = None,
 ):
     """Provide an in-memory, local DynamoDB service on an unused port
@@ -135,7 +447,14 @@ def patched_into_boto3(
         obtaining this software is https://docs.aws.amazon.com/amazondynamodb/latest/developerguide/DynamoDBLocal.DownloadingAndRunning.html
     :keyword port_range:
         An *iterable* of TCP port numbers to try, where the first one that
-        refuses a TCP connection is selected; default is ``range(8100, 8500)``
+        refuses a TCP connection is selected; by default, the operating system
+        assigns an unused ephemeral port
+    :keyword java_opts:
+        Options for the ``java`` command (before ``-jar``); default is
+        :data:`DEFAULT_JAVA_OPTS`
+    :keyword server_args:
+        Additional options for DynamoDBLocal itself (e.g.
+        ``-delayTransientStatuses`` or ``-disableTelemetry``)
     :keyword on_server_missing:
         If given, called back when *dynamodblocal_path* is ``None`` and access
         to the ``'dynamodb'`` service through :mod:`boto3` is attempted; this
@@ -155,7 +474,12 @@ def patched_into_boto3(
         raise Exception("No DynamoDBLocal configured (see logged errors)")
     
     if dynamodblocal_path is not None:
-        with in_subprocess(dynamodblocal_path, port_range=port_range) as port:
+        with in_subprocess(
+            dynamodblocal_path,
+            port_range=port_range,
+            java_opts=java_opts,
+            server_args=server_args,
+        ) as port:
             endpoint_kwargs = dict(
                 endpoint_url=f"http://localhost:{port}",
                 use_ssl=False,
@@ -194,27 +518,248 @@ def patched_into_boto3(
             )
             yield
 
+def _json_loads(data: bytes):
+    """Parse JSON from *data*, with :mod:`orjson` if installed"""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+def _worker_count(dynamodb_client, jobs: int) -> int:
+    """Threads to use for *jobs* concurrent requests through *dynamodb_client*
+    
+    Staying within the client's connection pool lets every thread keep its
+    HTTP connection alive rather than having urllib3 discard (and warn about)
+    connections that do not fit back into the pool.
+    """
+    return max(1, min(
+        MAX_CONCURRENT_REQUESTS,
+        dynamodb_client.meta.config.max_pool_connections,
+        jobs,
+    ))
+
+def _key_schema(key_schema):
+    return frozenset((k['AttributeName'], k['KeyType']) for k in key_schema)
+
+def _table_shape(table: dict):
+    """Reduce a table description to what emptying the table cannot change
+    
+    *table* may be either the ``Properties`` of a CloudFormation
+    ``AWS::DynamoDB::Table`` or the ``Table`` from a ``DescribeTable``
+    response; tables of equal shape differ only in their items (as far as
+    tests are concerned).
+    """
+    def indexes(kind):
+        return frozenset(
+            (
+                index['IndexName'],
+                _key_schema(index['KeySchema']),
+                index['Projection'].get('ProjectionType'),
+                frozenset(index['Projection'].get('NonKeyAttributes', ())),
+            )
+            for index in table.get(kind) or ()
+        )
+    
+    stream = table.get('StreamSpecification') or {}
+    return (
+        _key_schema(table['KeySchema']),
+        frozenset(
+            (a['AttributeName'], a['AttributeType'])
+            for a in table['AttributeDefinitions']
+        ),
+        indexes('GlobalSecondaryIndexes'),
+        indexes('LocalSecondaryIndexes'),
+        stream.get('StreamViewType') if stream.get('StreamEnabled', True) else None,
+    )
+
+def _last_per_key(items: Iterable[dict], key_names: Iterable[str]):
+    """Drop all but the last of the *items* sharing each key"""
+    key_names = tuple(key_names)
+    return {
+        tuple(item[k] for k in key_names): item
+        for item in items
+    }.values()
+
+# Most items DynamoDB accepts in one BatchWriteItem
+_BATCH_WRITE_LIMIT = 25
+
+def _batched(write_requests: Iterable[Tuple[str, dict]]):
+    """Group (table name, write request) pairs into ``RequestItems`` values
+    
+    Each ``RequestItems`` :class:`dict` yielded holds at most as many requests
+    as one ``BatchWriteItem`` accepts, possibly spanning several tables.
+    """
+    write_requests = iter(write_requests)
+    while True:
+        chunk = list(itertools.islice(write_requests, _BATCH_WRITE_LIMIT))
+        if not chunk:
+            return
+        request_items = {}
+        for table_name, request in chunk:
+            request_items.setdefault(table_name, []).append(request)
+        yield request_items
+
+def _write_batch(dynamodb_client, request_items: dict):
+    """Send one ``BatchWriteItem``, retrying unprocessed items with backoff"""
+    delay = 0.01
+    while request_items:
+        request_items = dynamodb_client.batch_write_item(
+            RequestItems=request_items,
+        ).get('UnprocessedItems')
+        if request_items:
+            time.sleep(delay)
+            delay = min(delay * 2, 1)
+
+def _empty_table(dynamodb_client, table: dict):
+    """Delete all items from the described *table*"""
+    key_names = {
+        f'#k{i}': k['AttributeName']
+        for i, k in enumerate(table['KeySchema'])
+    }
+    pages = dynamodb_client.get_paginator('scan').paginate(
+        TableName=table['TableName'],
+        ProjectionExpression=', '.join(key_names),
+        ExpressionAttributeNames=key_names,
+    )
+    for request_items in _batched(
+        (table['TableName'], {'DeleteRequest': {'Key': key}})
+        for page in pages
+        for key in page['Items']
+    ):
+        _write_batch(dynamodb_client, request_items)
+
+# Parsed serverless resources, keyed by (absolute config path, mtime in ns)
+_SLS_CACHE: Dict[Tuple[str, int], dict] = {}
+
+def _serverless_print(abspath: str) -> dict:
+    """Run ``serverless print`` to get the resources of a Serverless project"""
+    sls_dir, sls_config = os.path.split(abspath)
+    sls_proj = _json_loads(subp.check_output(
+        [
+            'serverless', 'print',
+            '--format=json',
+            '--config', sls_config,
+        ],
+        cwd=sls_dir,
+    ))
+    return sls_proj['resources']['Resources']
+
+@contextmanager
+def _locked(lock_path: str):
+    """Hold an exclusive lock on *lock_path* (where supported) in the context
+    
+    Failing to lock only loses the protection against concurrent work, so it
+    is logged rather than raised.
+    """
+    try:
+        os.makedirs(os.path.dirname(lock_path), exist_ok=True)
+        lock_file = open(lock_path, 'a')
+    except OSError:
+        _log.warning('Unable to open lock file %s', lock_path, exc_info=True)
+        yield
+        return
+    
+    with lock_file:
+        if sys.platform != 'win32':
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+        yield
+
+def _prune_serverless_cache(cache_prefix: str, current_file: str):
+    """Remove cache entries (and locks) starting with *cache_prefix* other than *current_file*"""
+    keep = {current_file, current_file + '.lock'}
+    try:
+        names = os.listdir(SERVERLESS_CACHE_DIR)
+    except OSError:
+        return
+    for name in names:
+        path = os.path.join(SERVERLESS_CACHE_DIR, name)
+        if name.startswith(cache_prefix) and path not in keep:
+            try:
+                os.remove(path)
+            except OSError:
+                _log.debug('Unable to remove stale cache file %s', path, exc_info=True)
+
+def _serverless_resources(serverless_config_path: str) -> dict:
+    """Get the CloudFormation resources of a Serverless project
+    
+    Running ``serverless print`` takes seconds, so the result is cached in
+    this process and, if :data:`SERVERLESS_CACHE_DIR` is set, on disk for
+    other processes.  Changing the modification time of the config file
+    invalidates the cached value, and writing a new on-disk entry removes
+    the entries for the config's earlier modification times.  Processes
+    needing the same uncached config wait on a file lock for the one running
+    ``serverless print``.
+    """
+    abspath = os.path.abspath(serverless_config_path)
+    key = (abspath, os.stat(abspath).st_mtime_ns)
+    if key in _SLS_CACHE:
+        return _SLS_CACHE[key]
+    
+    if SERVERLESS_CACHE_DIR is None:
+        resources = _serverless_print(abspath)
+    else:
+        cache_prefix = hashlib.sha1(abspath.encode('utf-8')).hexdigest() + '-'
+        cache_file = os.path.join(
+            SERVERLESS_CACHE_DIR,
+            f"{cache_prefix}{key[1]}.json",
+        )
+        with _locked(cache_file + '.lock'):
+            resources = None
+            if os.path.exists(cache_file):
+                try:
+                    with open(cache_file, 'rb') as f:
+                        resources = _json_loads(f.read())
+                except (OSError, ValueError):
+                    _log.warning('Unable to read cached Serverless resources from %s', cache_file, exc_info=True)
+            
+            if resources is None:
+                resources = _serverless_print(abspath)
+                
+                # Write to a temporary file and rename, so no reader ever
+                # sees a partial cache file
+                try:
+                    with tempfile.NamedTemporaryFile(
+                        'w',
+                        encoding='utf-8',
+                        dir=SERVERLESS_CACHE_DIR,
+                        suffix='.tmp',
+                        delete=False,
+                    ) as f:
+                        json.dump(resources, f)
+                    os.replace(f.name, cache_file)
+                except OSError:
+                    _log.warning('Unable to cache Serverless resources in %s', cache_file, exc_info=True)
+                else:
+                    _prune_serverless_cache(cache_prefix, cache_file)
+    
+    _SLS_CACHE[key] = resources
+    return resources
+
 class LocalTableBuilder:
     """Create DynamoDB tables according to the Serverless config in a local DynamoDB
     
     Table specifications are read via the ``serverless print`` command, so
     the ``serverless`` tool must be installed for this to function properly.
     The serverless config is only read when this object is created so this
-    expensive operation can be amortized.
+    expensive operation can be amortized; the result is also cached in this
+    process (and optionally on disk, see :data:`SERVERLESS_CACHE_DIR`) until
+    the config file is modified.
     """
     def __init__(self, serverless_config_path: str):
         super().__init__()
         self._serverless_config_path = serverless_config_path
-        sls_dir, sls_config = os.path.split(serverless_config_path)
-        sls_proj = json.loads(subp.check_output(
-            [
-                'serverless', 'print',
-                '--format=json',
-                '--config', sls_config,
-            ],
-            cwd=sls_dir,
-        ))
-        self._resources = sls_proj['resources']['Resources']
+        self._resources = _serverless_resources(serverless_config_path)
+        by_type = {}
+        for r in self._resources.values():
+            by_type.setdefault(r['Type'], []).append(r)
+        self._by_type: Dict[str, Tuple[dict, ...]] = {
+            resource_type: tuple(resources)
+            for resource_type, resources in by_type.items()
+        }
+        self._tables = self._by_type.get('AWS::DynamoDB::Table', ())
+        self._tables_by_name = {
+            t['Properties']['TableName']: t for t in self._tables
+        }
+        self._table_names = frozenset(self._tables_by_name)
     
     @property
     def serverless_config_path(self):
@@ -222,30 +767,78 @@ class LocalTableBuilder:
     
     @property
     def tables(self):
-        yield from (
-            r
-            for r in self._resources.values()
-            if r['Type'] == 'AWS::DynamoDB::Table'
-        )
+        return self._tables
     
-    def recreate_through(self, dynamodb_client):
+    def key_names(self, table_name: str) -> Optional[List[str]]:
+        """Key attribute names of a table in the Serverless config
+        
+        Returns ``None`` if *table_name* is not in the Serverless config.
+        """
+        table = self._tables_by_name.get(table_name)
+        if table is None:
+            return None
+        return [k['AttributeName'] for k in table['Properties']['KeySchema']]
+    
+    def recreate_through(self, dynamodb_client) -> Dict[str, bool]:
         """Create DynamoDB tables according to the Serverless config in a local DynamoDB
         
         This method asserts that the client it is given connects to some TCP
         port on localhost.  Use an appropriate system (like the context manager
         :func:`.patched_into_boto3`) to provide a DynamoDBLocal instance.
         
-        Tables in the Serverless config that already exist are dropped and
-        recreated.
+        Tables in the Serverless config that already exist with the same keys,
+        indexes, and stream setting are emptied; other existing tables are
+        dropped and recreated.  Requests are issued concurrently (up to
+        :data:`MAX_CONCURRENT_REQUESTS` at a time, or the client's
+        ``max_pool_connections`` if less), so *dynamodb_client* must be safe
+        to share between threads, as :mod:`boto3` clients are.
+        
+        Returns a :class:`dict` mapping each table name to whether the
+        existing table was reused (emptied rather than recreated).
         """
         ddb = dynamodb_client
         assert ddb.meta.endpoint_url.startswith('http://localhost:')
-        existing_tables = ddb.list_tables()['TableNames']
+        existing_tables = set(
+            table_name
+            for page in ddb.get_paginator('list_tables').paginate()
+            for table_name in page['TableNames']
+        )
+        to_reset = list(self._table_names & existing_tables)
+        
+        def reset(table_name):
+            table = ddb.describe_table(TableName=table_name)['Table']
+            table_props = self._tables_by_name[table_name]['Properties']
+            if _table_shape(table) == _table_shape(table_props):
+                _empty_table(ddb, table)
+                return True
+            _log.debug('Schema of table %s has changed; dropping it', table_name)
+            ddb.delete_table(TableName=table_name)
+            return False
         
-        for t in self.tables:
-            if t['Properties']['TableName'] in existing_tables:
-                ddb.delete_table(TableName=t['Properties']['TableName'])
-            ddb.create_table(**t['Properties'])
+        # DynamoDBLocal handles requests concurrently, so overlap the round trips
+        with ThreadPoolExecutor(
+            max_workers=_worker_count(ddb, len(self._tables))
+        ) as executor:
+            reused = {
+                table_name
+                for table_name, was_reused in zip(
+                    to_reset,
+                    executor.map(reset, to_reset),
+                )
+                if was_reused
+            }
+            list(executor.map(
+                lambda t: ddb.create_table(**t['Properties']),
+                [
+                    t for t in self.tables
+                    if t['Properties']['TableName'] not in reused
+                ],
+            ))
+        
+        return {
+            table_name: table_name in reused
+            for table_name in self._tables_by_name
+        }
 
 class LocalDbOps:
     """Support for operations on a DynamoDBLocal"""
@@ -257,11 +850,9 @@ class LocalDbOps:
     def serverless_config(self):
         return self._serverless_config
     
-    @property
+    @cached_property
     def table_builder(self):
-        if not hasattr(self, '_table_builder'):
-            self._table_builder = LocalTableBuilder(self.serverless_config)
-        return self._table_builder
+        return LocalTableBuilder(self.serverless_config)
     
     def fresh_test_tables(self, dynamodb_resource, fixture_data: Optional[dict] = None):
         """Create or recreate tables and fill with the given data
@@ -270,15 +861,49 @@ class LocalDbOps:
         keys are the DynamoDB table names and values are the items to insert
         into those tables.  Item format follows the :mod:`boto3` *resource*
         usage rather than the *client* usage: item attribute types are inferred
-        from the Python types rather than explicitly specified.
+        from the Python types rather than explicitly specified.  If several
+        items for a table have the same key, the last one is kept.
         """
         ddb = dynamodb_resource
-        self.table_builder.recreate_through(ddb.meta.client)
+        client = ddb.meta.client
+        reused = self.table_builder.recreate_through(client)
+        _log.info(
+            '%d of %d tables emptied rather than recreated',
+            sum(reused.values()), len(reused),
+        )
         
         _log.info('%d tables to populate', len(fixture_data or ()))
-        for table_name in (fixture_data or ()):
-            table = ddb.Table(table_name)
-            with table.batch_writer() as batch:
-                for item in fixture_data[table_name]:
+        if not fixture_data:
+            return
+        
+        from boto3.dynamodb.types import TypeSerializer
+        serializer = TypeSerializer()
+        
+        def key_names(table_name):
+            names = self.table_builder.key_names(table_name)
+            if names is None:
+                key_schema = client.describe_table(TableName=table_name)['Table']['KeySchema']
+                names = [k['AttributeName'] for k in key_schema]
+            return names
+        
+        # Batches are written concurrently, so items sharing a key must be
+        # reduced to the last one here for the last write to win
+        def put_requests():
+            for table_name, items in fixture_data.items():
+                for item in _last_per_key(items, key_names(table_name)):
                     _log.debug('Adding item to table %s: %r', table_name, item)
-                    batch.put_item(Item=item)
+                    yield table_name, {'PutRequest': {'Item': {
+                        k: serializer.serialize(v)
+                        for k, v in item.items()
+                    }}}
+        
+        # Each batch may span tables; the client is thread-safe, so send the
+        # batches concurrently
+        batches = list(_batched(put_requests()))
+        with ThreadPoolExecutor(
+            max_workers=_worker_count(client, len(batches))
+        ) as executor:
+            list(executor.map(
+                lambda request_items: _write_batch(client, request_items),
+                batches,
+            ))
@@ -38,7 +38,7 @@ setuptools.setup(
     ],
     packages=setuptools.find_packages('lib'),
     package_dir={'': 'lib'},
-    python_requires='>=3.6',
+    python_requires='>=3.8',
     install_requires=[
         "psutil~=5.8; sys.platform == 'win32'",
     ],
@@ -46,5 +46,8 @@ setuptools.setup(
         'boto3': [
             'boto3_mocking<2'
         ],
+        'fast-json': [
+            'orjson>=3',
+        ],
     },
 )
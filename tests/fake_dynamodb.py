@@ -0,0 +1,66 @@
+"""Recording stand-in for a :mod:`boto3` DynamoDB client in the table tests"""
+import threading
+from types import SimpleNamespace
+
+class FakeDynamoDBClient:
+    """Answers from canned tables and items, recording each call made
+
+    *tables* are DescribeTable results (``Table`` values); *items* maps
+    table names to the items a scan returns, two per page; each entry of
+    *unprocessed* is the ``UnprocessedItems`` returned by the next
+    ``batch_write_item``.
+    """
+    def __init__(self, tables=(), items=None, unprocessed=()):
+        self.meta = SimpleNamespace(
+            endpoint_url='http://localhost:8000',
+            config=SimpleNamespace(max_pool_connections=10),
+        )
+        self.tables = {t['TableName']: t for t in tables}
+        self.items = items or {}
+        self.unprocessed = list(unprocessed)
+        self.calls = []
+        self._lock = threading.Lock()
+
+    def _record(self, operation_name, **kwargs):
+        with self._lock:
+            self.calls.append((operation_name, kwargs))
+
+    def calls_to(self, operation_name):
+        return [kwargs for op, kwargs in self.calls if op == operation_name]
+
+    def get_paginator(self, operation_name):
+        return SimpleNamespace(
+            paginate=lambda **kwargs: self._pages(operation_name, **kwargs),
+        )
+
+    def _pages(self, operation_name, **kwargs):
+        self._record(operation_name, **kwargs)
+        if operation_name == 'list_tables':
+            for table_name in sorted(self.tables):
+                yield {'TableNames': [table_name]}
+        elif operation_name == 'scan':
+            items = self.items.get(kwargs['TableName'], [])
+            for i in range(0, max(len(items), 1), 2):
+                yield {'Items': items[i:i + 2]}
+        else:
+            raise NotImplementedError(operation_name)
+
+    def describe_table(self, TableName):
+        self._record('describe_table', TableName=TableName)
+        return {'Table': self.tables[TableName]}
+
+    def delete_table(self, TableName):
+        self._record('delete_table', TableName=TableName)
+        with self._lock:
+            del self.tables[TableName]
+
+    def create_table(self, **kwargs):
+        self._record('create_table', **kwargs)
+        with self._lock:
+            self.tables[kwargs['TableName']] = kwargs
+
+    def batch_write_item(self, RequestItems):
+        self._record('batch_write_item', RequestItems=RequestItems)
+        with self._lock:
+            unprocessed = self.unprocessed.pop(0) if self.unprocessed else {}
+        return {'UnprocessedItems': unprocessed}
@@ -0,0 +1,33 @@
+"""Stand-in for ``java ... -jar DynamoDBLocal.jar`` in the server tests
+
+Run in the DynamoDBLocal directory, this records its process ID and
+arguments there in ``server.json``, then listens on the ``-port`` given --
+after sleeping for the seconds in a ``listen_delay`` file, if there is one --
+until it is terminated.
+"""
+import json
+import os
+import socket
+import sys
+import time
+
+def main(args):
+    with open('server.json.tmp', 'w') as f:
+        json.dump({'pid': os.getpid(), 'args': args}, f)
+    os.replace('server.json.tmp', 'server.json')
+
+    try:
+        with open('listen_delay') as f:
+            time.sleep(float(f.read()))
+    except FileNotFoundError:
+        pass
+
+    port = int(args[args.index('-port') + 1])
+    with socket.socket() as listener:
+        listener.bind(('127.0.0.1', port))
+        listener.listen()
+        while True:
+            listener.accept()[0].close()
+
+if __name__ == '__main__':
+    main(sys.argv[1:])
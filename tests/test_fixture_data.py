@@ -0,0 +1,133 @@
+import unittest
+from types import SimpleNamespace
+from unittest.mock import patch
+
+import run_dynamodblocal as rddbl
+
+from fake_dynamodb import FakeDynamoDBClient
+
+try:
+    import boto3
+except ImportError:
+    boto3 = None
+
+USERS_TABLE = {
+    'TableName': 'users',
+    'KeySchema': [
+        {'AttributeName': 'pk', 'KeyType': 'HASH'},
+        {'AttributeName': 'sk', 'KeyType': 'RANGE'},
+    ],
+    'AttributeDefinitions': [
+        {'AttributeName': 'pk', 'AttributeType': 'S'},
+        {'AttributeName': 'sk', 'AttributeType': 'S'},
+    ],
+    'BillingMode': 'PAY_PER_REQUEST',
+}
+
+def put(**item):
+    return {'PutRequest': {'Item': item}}
+
+class BatchedTests(unittest.TestCase):
+    def test_batches_span_tables(self):
+        requests = [('a', {'n': i}) for i in range(20)]
+        requests += [('b', {'n': i}) for i in range(10)]
+        batches = list(rddbl._batched(requests))
+
+        self.assertEqual(
+            [{t: len(r) for t, r in batch.items()} for batch in batches],
+            [{'a': 20, 'b': 5}, {'b': 5}],
+        )
+        self.assertEqual(
+            [r['n'] for batch in batches for r in batch.get('b', ())],
+            list(range(10)),
+        )
+
+    def test_exact_multiple(self):
+        batches = list(rddbl._batched(('a', {}) for _ in range(50)))
+        self.assertEqual([len(b['a']) for b in batches], [25, 25])
+
+    def test_empty(self):
+        self.assertEqual(list(rddbl._batched(())), [])
+
+class LastPerKeyTests(unittest.TestCase):
+    def test_last_item_wins(self):
+        items = [
+            {'pk': 'a', 'sk': 1, 'v': 'first'},
+            {'pk': 'a', 'sk': 2, 'v': 'other'},
+            {'pk': 'b', 'sk': 1, 'v': 'only'},
+            {'pk': 'a', 'sk': 1, 'v': 'last'},
+        ]
+        self.assertEqual(
+            sorted(
+                (i['pk'], i['sk'], i['v'])
+                for i in rddbl._last_per_key(items, ['pk', 'sk'])
+            ),
+            [('a', 1, 'last'), ('a', 2, 'other'), ('b', 1, 'only')],
+        )
+
+class WriteBatchTests(unittest.TestCase):
+    def test_unprocessed_items_resent(self):
+        request_items = {
+            'a': [put(n={'N': str(i)}) for i in range(3)],
+            'b': [put(n={'N': '9'})],
+        }
+        unprocessed = {'a': [put(n={'N': '1'})], 'b': [put(n={'N': '9'})]}
+        client = FakeDynamoDBClient(unprocessed=[unprocessed])
+
+        with patch.object(rddbl.time, 'sleep') as sleep:
+            rddbl._write_batch(client, request_items)
+
+        self.assertEqual(
+            [c['RequestItems'] for c in client.calls_to('batch_write_item')],
+            [request_items, unprocessed],
+        )
+        sleep.assert_called_once()
+
+    def test_no_retry_when_all_processed(self):
+        client = FakeDynamoDBClient()
+        with patch.object(rddbl.time, 'sleep') as sleep:
+            rddbl._write_batch(client, {'a': [put(n={'N': '1'})]})
+
+        self.assertEqual(len(client.calls_to('batch_write_item')), 1)
+        sleep.assert_not_called()
+
+@unittest.skipIf(boto3 is None, "boto3 is not installed")
+class FreshTestTablesTests(unittest.TestCase):
+    def setUp(self):
+        p = patch.object(rddbl, '_serverless_resources', return_value={
+            'UsersTable': {'Type': 'AWS::DynamoDB::Table', 'Properties': USERS_TABLE},
+        })
+        p.start()
+        self.addCleanup(p.stop)
+        self.db_ops = rddbl.LocalDbOps(serverless_config='serverless.yml')
+
+    def test_key_names(self):
+        self.assertEqual(self.db_ops.table_builder.key_names('users'), ['pk', 'sk'])
+        self.assertIsNone(self.db_ops.table_builder.key_names('other'))
+
+    def test_items_serialized_and_unconfigured_table_described(self):
+        other = {
+            'TableName': 'other',
+            'KeySchema': [{'AttributeName': 'id', 'KeyType': 'HASH'}],
+        }
+        client = FakeDynamoDBClient(tables=[other])
+
+        self.db_ops.fresh_test_tables(
+            SimpleNamespace(meta=SimpleNamespace(client=client)),
+            {
+                'users': [
+                    {'pk': 'a', 'sk': '1', 'n': 1},
+                    {'pk': 'a', 'sk': '1', 'n': 2, 'tags': {'x'}},
+                ],
+                'other': [{'id': 'x', 'ok': True}],
+            },
+        )
+
+        self.assertEqual(client.calls_to('describe_table'), [{'TableName': 'other'}])
+        self.assertEqual(client.calls_to('batch_write_item'), [{'RequestItems': {
+            'users': [put(
+                pk={'S': 'a'}, sk={'S': '1'},
+                n={'N': '2'}, tags={'SS': ['x']},
+            )],
+            'other': [put(id={'S': 'x'}, ok={'BOOL': True})],
+        }}])
@@ -0,0 +1,34 @@
+import socket
+import unittest
+from unittest.mock import patch
+
+import run_dynamodblocal as rddbl
+
+class FirstRefusingPortTests(unittest.TestCase):
+    def test_skips_listening_port(self):
+        with socket.socket() as listener:
+            listener.bind(('127.0.0.1', 0))
+            listener.listen()
+            busy_port = listener.getsockname()[1]
+            free_port = rddbl._ephemeral_port()
+
+            self.assertEqual(
+                rddbl._first_refusing_port([busy_port, free_port]),
+                free_port,
+            )
+
+    def test_none_free(self):
+        with socket.socket() as listener:
+            listener.bind(('127.0.0.1', 0))
+            listener.listen()
+            busy_port = listener.getsockname()[1]
+
+            self.assertIsNone(rddbl._first_refusing_port([busy_port, busy_port]))
+
+    def test_single_port_is_not_probed(self):
+        with patch.object(rddbl.socket, 'socket') as mock_socket:
+            self.assertEqual(rddbl._first_refusing_port([8123]), 8123)
+        mock_socket.assert_not_called()
+
+    def test_empty_range(self):
+        self.assertIsNone(rddbl._first_refusing_port([]))
@@ -0,0 +1,64 @@
+import os
+import tempfile
+import unittest
+from unittest.mock import patch
+
+import run_dynamodblocal as rddbl
+
+class ServerlessCacheTests(unittest.TestCase):
+    RESOURCES = {'T': {'Type': 'AWS::DynamoDB::Table', 'Properties': {}}}
+
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.config = os.path.join(tmp.name, 'serverless.yml')
+        with open(self.config, 'w'):
+            pass
+        self.cache_dir = os.path.join(tmp.name, 'cache')
+
+        for p in (
+            patch.dict(rddbl._SLS_CACHE, clear=True),
+            patch.object(rddbl, 'SERVERLESS_CACHE_DIR', self.cache_dir),
+        ):
+            p.start()
+            self.addCleanup(p.stop)
+        sls_print = patch.object(
+            rddbl, '_serverless_print',
+            return_value=self.RESOURCES,
+        )
+        self.sls_print = sls_print.start()
+        self.addCleanup(sls_print.stop)
+
+    def touch(self, mtime_ns):
+        os.utime(self.config, ns=(mtime_ns, mtime_ns))
+
+    def test_reused_in_process(self):
+        rddbl._serverless_resources(self.config)
+        rddbl._serverless_resources(self.config)
+        self.assertEqual(self.sls_print.call_count, 1)
+
+    def test_reused_from_disk(self):
+        rddbl._serverless_resources(self.config)
+        rddbl._SLS_CACHE.clear()
+        self.assertEqual(rddbl._serverless_resources(self.config), self.RESOURCES)
+        self.assertEqual(self.sls_print.call_count, 1)
+
+    def test_modification_invalidates_and_prunes(self):
+        self.touch(1_000_000_000)
+        rddbl._serverless_resources(self.config)
+        self.touch(2_000_000_000)
+        rddbl._serverless_resources(self.config)
+
+        self.assertEqual(self.sls_print.call_count, 2)
+        self.assertEqual(
+            sorted(n.rsplit('-', 1)[1] for n in os.listdir(self.cache_dir)),
+            ['2000000000.json', '2000000000.json.lock'],
+        )
+
+    def test_disk_cache_disabled(self):
+        rddbl.SERVERLESS_CACHE_DIR = None
+        rddbl._serverless_resources(self.config)
+        rddbl._SLS_CACHE.clear()
+        rddbl._serverless_resources(self.config)
+        self.assertEqual(self.sls_print.call_count, 2)
+        self.assertFalse(os.path.exists(self.cache_dir))
@@ -0,0 +1,197 @@
+import asyncio
+import json
+import signal
+import os
+import socket
+import sys
+import tempfile
+import time
+import unittest
+from unittest.mock import patch
+
+import run_dynamodblocal as rddbl
+
+FAKE_SERVER = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fake_dynamodblocal.py')
+
+@unittest.skipIf(sys.platform == 'win32', "the fake java command is a shell script")
+class FakeServerTestCase(unittest.TestCase):
+    """Runs the servers through a fake ``java`` that starts :data:`FAKE_SERVER`"""
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.server_dir = tmp.name
+
+        java = os.path.join(self.server_dir, 'java')
+        with open(java, 'w') as f:
+            f.write(f'#!/bin/sh\nexec "{sys.executable}" "{FAKE_SERVER}" "$@"\n')
+        os.chmod(java, 0o755)
+        p = patch.object(rddbl, 'JAVA_PROGRAM', java)
+        p.start()
+        self.addCleanup(p.stop)
+
+    @property
+    def info_path(self):
+        return os.path.join(self.server_dir, 'server.json')
+
+    def delay_listening(self, seconds):
+        with open(os.path.join(self.server_dir, 'listen_delay'), 'w') as f:
+            f.write(str(seconds))
+
+    def server_info(self):
+        """Wait for the fake server to start and return what it recorded"""
+        deadline = time.monotonic() + 10
+        while not os.path.exists(self.info_path):
+            if time.monotonic() > deadline:
+                self.fail("fake DynamoDBLocal did not start")
+            time.sleep(0.01)
+        with open(self.info_path) as f:
+            return json.load(f)
+
+    def interrupt_when_started(self):
+        """Readiness delays that raise KeyboardInterrupt once the server runs"""
+        while not os.path.exists(self.info_path):
+            yield 0.01
+        raise KeyboardInterrupt
+
+    def assertExited(self, pid):
+        with self.assertRaises(ProcessLookupError):
+            os.kill(pid, 0)
+
+    def assertAccepts(self, port):
+        socket.create_connection(('127.0.0.1', port), 1).close()
+
+class InSubprocessTests(FakeServerTestCase):
+    def test_started_and_stopped(self):
+        with rddbl.in_subprocess(self.server_dir) as port:
+            self.assertAccepts(port)
+            info = self.server_info()
+
+        self.assertEqual(info['args'][info['args'].index('-port') + 1], str(port))
+        self.assertExited(info['pid'])
+
+    def test_not_ready_stops_server(self):
+        self.delay_listening(30)
+        with patch.object(rddbl, 'SERVER_READY_TIMEOUT', 0.5):
+            with self.assertRaisesRegex(Exception, 'did not accept connections'):
+                with rddbl.in_subprocess(self.server_dir):
+                    self.fail("context entered")
+
+        self.assertExited(self.server_info()['pid'])
+
+    def test_interrupted_startup_stops_server(self):
+        self.delay_listening(30)
+        with patch.object(rddbl, '_ready_poll_delays', self.interrupt_when_started):
+            with self.assertRaises(KeyboardInterrupt):
+                with rddbl.in_subprocess(self.server_dir):
+                    self.fail("context entered")
+
+        self.assertExited(self.server_info()['pid'])
+
+class FakeDynamoDBClient:
+    """Just enough of a DynamoDB client for dropping every table"""
+    def __init__(self, table_pages):
+        self.table_pages = table_pages
+        self.deleted = []
+
+    def get_paginator(self, operation_name):
+        assert operation_name == 'list_tables'
+        return self
+
+    def paginate(self):
+        return ({'TableNames': names} for names in self.table_pages)
+
+    def delete_table(self, TableName):
+        self.deleted.append(TableName)
+
+class InSubprocessPooledTests(FakeServerTestCase):
+    def setUp(self):
+        super().setUp()
+        p = patch.object(rddbl, '_SESSION_SERVER', None)
+        p.start()
+        self.addCleanup(p.stop)
+        self.addCleanup(rddbl._shutdown_session_server)
+
+    def test_server_shared(self):
+        with rddbl.in_subprocess_pooled(self.server_dir) as port:
+            info = self.server_info()
+        with rddbl.in_subprocess_pooled(self.server_dir) as second_port:
+            self.assertAccepts(second_port)
+
+        self.assertEqual(second_port, port)
+        self.assertEqual(rddbl._SESSION_SERVER[0].pid, info['pid'])
+        self.assertIn('-sharedDb', info['args'])
+
+    def test_dead_server_restarted(self):
+        with rddbl.in_subprocess_pooled(self.server_dir):
+            first_pid = self.server_info()['pid']
+        os.remove(self.info_path)
+        os.kill(first_pid, signal.SIGKILL)
+        rddbl._SESSION_SERVER[0].wait()
+
+        with rddbl.in_subprocess_pooled(self.server_dir) as port:
+            self.assertAccepts(port)
+            second_pid = self.server_info()['pid']
+
+        self.assertNotEqual(second_pid, first_pid)
+        self.assertEqual(rddbl._SESSION_SERVER[0].pid, second_pid)
+
+    def test_tables_dropped_from_every_page(self):
+        client = FakeDynamoDBClient([['a', 'b'], [], ['c']])
+        ports = []
+        def client_for(port):
+            ports.append(port)
+            return client
+
+        with rddbl.in_subprocess_pooled(self.server_dir, dynamodb_client_for=client_for) as port:
+            self.assertEqual(client.deleted, [])
+
+        self.assertEqual(ports, [port])
+        self.assertEqual(client.deleted, ['a', 'b', 'c'])
+
+    def test_shutdown_stops_server(self):
+        with rddbl.in_subprocess_pooled(self.server_dir):
+            pid = self.server_info()['pid']
+        os.kill(pid, 0)  # still running after the context exits
+
+        rddbl._shutdown_session_server()
+
+        self.assertIsNone(rddbl._SESSION_SERVER)
+        self.assertExited(pid)
+
+class InSubprocessAsyncTests(FakeServerTestCase, unittest.IsolatedAsyncioTestCase):
+    async def wait_for_start(self):
+        while not os.path.exists(self.info_path):
+            await asyncio.sleep(0.01)
+
+    async def test_started_and_stopped(self):
+        async with rddbl.in_subprocess_async(self.server_dir) as port:
+            _, writer = await asyncio.open_connection('127.0.0.1', port)
+            writer.close()
+            info = self.server_info()
+
+        self.assertEqual(info['args'][info['args'].index('-port') + 1], str(port))
+        self.assertExited(info['pid'])
+
+    async def test_not_ready_stops_server(self):
+        self.delay_listening(30)
+        with patch.object(rddbl, 'SERVER_READY_TIMEOUT', 0.5):
+            with self.assertRaisesRegex(Exception, 'did not accept connections'):
+                async with rddbl.in_subprocess_async(self.server_dir):
+                    self.fail("context entered")
+
+        self.assertExited(self.server_info()['pid'])
+
+    async def test_cancelled_startup_stops_server(self):
+        self.delay_listening(30)
+
+        async def use_server():
+            async with rddbl.in_subprocess_async(self.server_dir):
+                self.fail("context entered")
+
+        task = asyncio.ensure_future(use_server())
+        await self.wait_for_start()
+        task.cancel()
+        with self.assertRaises(asyncio.CancelledError):
+            await task
+
+        self.assertExited(self.server_info()['pid'])
@@ -0,0 +1,185 @@
+import copy
+import unittest
+from unittest.mock import patch
+
+import run_dynamodblocal as rddbl
+
+from fake_dynamodb import FakeDynamoDBClient
+
+CFN_TABLE = {
+    'TableName': 'users',
+    'KeySchema': [
+        {'AttributeName': 'pk', 'KeyType': 'HASH'},
+        {'AttributeName': 'sk', 'KeyType': 'RANGE'},
+    ],
+    'AttributeDefinitions': [
+        {'AttributeName': 'pk', 'AttributeType': 'S'},
+        {'AttributeName': 'sk', 'AttributeType': 'S'},
+        {'AttributeName': 'email', 'AttributeType': 'S'},
+        {'AttributeName': 'created', 'AttributeType': 'N'},
+    ],
+    'GlobalSecondaryIndexes': [
+        {
+            'IndexName': 'by-email',
+            'KeySchema': [{'AttributeName': 'email', 'KeyType': 'HASH'}],
+            'Projection': {
+                'ProjectionType': 'INCLUDE',
+                'NonKeyAttributes': ['name', 'plan'],
+            },
+        },
+    ],
+    'LocalSecondaryIndexes': [
+        {
+            'IndexName': 'by-created',
+            'KeySchema': [
+                {'AttributeName': 'pk', 'KeyType': 'HASH'},
+                {'AttributeName': 'created', 'KeyType': 'RANGE'},
+            ],
+            'Projection': {'ProjectionType': 'KEYS_ONLY'},
+        },
+    ],
+    'BillingMode': 'PAY_PER_REQUEST',
+}
+
+def described(cfn_table):
+    """Render CloudFormation table properties the way DescribeTable does"""
+    table = copy.deepcopy(cfn_table)
+    table.pop('BillingMode', None)
+    table['AttributeDefinitions'].reverse()
+    table['TableStatus'] = 'ACTIVE'
+    table['ItemCount'] = 0
+    for index in table.get('GlobalSecondaryIndexes', ()):
+        index['Projection'].get('NonKeyAttributes', []).reverse()
+        index['IndexStatus'] = 'ACTIVE'
+        index['ProvisionedThroughput'] = {
+            'ReadCapacityUnits': 0,
+            'WriteCapacityUnits': 0,
+        }
+    for index in table.get('LocalSecondaryIndexes', ()):
+        index['IndexSizeBytes'] = 0
+    stream = table.get('StreamSpecification')
+    if stream is not None:
+        table['StreamSpecification'] = dict(stream, StreamEnabled=True)
+    return table
+
+class TableShapeTests(unittest.TestCase):
+    def assertSameShape(self, cfn_table, description):
+        self.assertEqual(
+            rddbl._table_shape(cfn_table),
+            rddbl._table_shape(description),
+        )
+
+    def assertDifferentShape(self, cfn_table, description):
+        self.assertNotEqual(
+            rddbl._table_shape(cfn_table),
+            rddbl._table_shape(description),
+        )
+
+    def test_description_matches_its_cloudformation(self):
+        self.assertSameShape(CFN_TABLE, described(CFN_TABLE))
+
+    def test_gsi_projection_drift(self):
+        desc = described(CFN_TABLE)
+        desc['GlobalSecondaryIndexes'][0]['Projection'] = {'ProjectionType': 'ALL'}
+        self.assertDifferentShape(CFN_TABLE, desc)
+
+    def test_gsi_non_key_attribute_drift(self):
+        desc = described(CFN_TABLE)
+        desc['GlobalSecondaryIndexes'][0]['Projection']['NonKeyAttributes'] = ['name']
+        self.assertDifferentShape(CFN_TABLE, desc)
+
+    def test_lsi_projection_drift(self):
+        desc = described(CFN_TABLE)
+        desc['LocalSecondaryIndexes'][0]['Projection'] = {'ProjectionType': 'ALL'}
+        self.assertDifferentShape(CFN_TABLE, desc)
+
+    def test_missing_index(self):
+        desc = described(CFN_TABLE)
+        del desc['LocalSecondaryIndexes']
+        self.assertDifferentShape(CFN_TABLE, desc)
+
+    def test_key_drift(self):
+        desc = described(CFN_TABLE)
+        desc['KeySchema'] = [{'AttributeName': 'pk', 'KeyType': 'HASH'}]
+        self.assertDifferentShape(CFN_TABLE, desc)
+
+    def test_stream_on_matches(self):
+        cfn = dict(CFN_TABLE, StreamSpecification={'StreamViewType': 'NEW_IMAGE'})
+        self.assertSameShape(cfn, described(cfn))
+
+    def test_stream_turned_on(self):
+        cfn = dict(CFN_TABLE, StreamSpecification={'StreamViewType': 'NEW_IMAGE'})
+        self.assertDifferentShape(cfn, described(CFN_TABLE))
+
+    def test_stream_turned_off(self):
+        cfn = dict(CFN_TABLE, StreamSpecification={'StreamViewType': 'NEW_IMAGE'})
+        self.assertDifferentShape(CFN_TABLE, described(cfn))
+
+    def test_disabled_stream_matches_no_stream(self):
+        desc = described(CFN_TABLE)
+        desc['StreamSpecification'] = {'StreamEnabled': False}
+        self.assertSameShape(CFN_TABLE, desc)
+
+    def test_stream_view_type_drift(self):
+        cfn = dict(CFN_TABLE, StreamSpecification={'StreamViewType': 'NEW_IMAGE'})
+        desc = described(cfn)
+        desc['StreamSpecification']['StreamViewType'] = 'KEYS_ONLY'
+        self.assertDifferentShape(cfn, desc)
+
+class RecreateThroughTests(unittest.TestCase):
+    def setUp(self):
+        p = patch.object(rddbl, '_serverless_resources', return_value={
+            'UsersTable': {'Type': 'AWS::DynamoDB::Table', 'Properties': CFN_TABLE},
+            'Queue': {'Type': 'AWS::SQS::Queue', 'Properties': {}},
+        })
+        p.start()
+        self.addCleanup(p.stop)
+        self.builder = rddbl.LocalTableBuilder('serverless.yml')
+
+    def test_matching_table_emptied(self):
+        keys = [{'pk': {'S': 'p'}, 'sk': {'S': str(i)}} for i in range(30)]
+        client = FakeDynamoDBClient(
+            tables=[described(CFN_TABLE)],
+            items={'users': keys},
+        )
+
+        self.assertEqual(self.builder.recreate_through(client), {'users': True})
+
+        self.assertEqual(client.calls_to('scan'), [{
+            'TableName': 'users',
+            'ProjectionExpression': '#k0, #k1',
+            'ExpressionAttributeNames': {'#k0': 'pk', '#k1': 'sk'},
+        }])
+        batches = [c['RequestItems']['users'] for c in client.calls_to('batch_write_item')]
+        self.assertEqual([len(b) for b in batches], [25, 5])
+        self.assertEqual(
+            [r['DeleteRequest']['Key'] for b in batches for r in b],
+            keys,
+        )
+        self.assertEqual(client.calls_to('delete_table'), [])
+        self.assertEqual(client.calls_to('create_table'), [])
+
+    def test_drifted_table_recreated(self):
+        desc = described(CFN_TABLE)
+        desc['KeySchema'] = [{'AttributeName': 'pk', 'KeyType': 'HASH'}]
+        client = FakeDynamoDBClient(tables=[desc], items={'users': [{'pk': {'S': 'p'}}]})
+
+        self.assertEqual(self.builder.recreate_through(client), {'users': False})
+
+        self.assertEqual(client.calls_to('delete_table'), [{'TableName': 'users'}])
+        self.assertEqual(client.calls_to('create_table'), [CFN_TABLE])
+        self.assertEqual(client.calls_to('scan'), [])
+        self.assertEqual(client.calls_to('batch_write_item'), [])
+
+    def test_missing_table_created(self):
+        other = dict(described(CFN_TABLE), TableName='other')
+        client = FakeDynamoDBClient(tables=[other])
+
+        self.assertEqual(self.builder.recreate_through(client), {'users': False})
+
+        self.assertEqual(
+            [op for op, _ in client.calls],
+            ['list_tables', 'create_table'],
+        )
+        self.assertEqual(client.calls_to('create_table'), [CFN_TABLE])
+        self.assertIn('other', client.tables)